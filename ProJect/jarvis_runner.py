@@ -1,7 +1,14 @@
+import codecs
+import concurrent.futures
+import io
+import locale
+import os
+import queue
 import subprocess
-import threading
+import time
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from types import MappingProxyType
+from tkinter import ttk, messagebox
 
 # ------------------- CONFIG -------------------
 # Predefined CMD commands (safe, non-destructive)
@@ -12,33 +19,70 @@ COMMANDS = {
     "List Tasks (tasklist)": ["cmd", "/c", "tasklist"],
     "Show System Info": ["cmd", "/c", "systeminfo"],
 }
+# Read-only at runtime: tuple argvs can be hashed (see _CMD_CACHE) and shared
+COMMANDS = MappingProxyType({k: tuple(v) for k, v in COMMANDS.items()})
+
+DRAIN_MS = 50  # how often queued output is flushed into the widget
+MAX_WORKERS = 8  # commands allowed to run at the same time
+MAX_LINES = 5000  # default cap on log lines; oldest lines are dropped first
+READ_SIZE = 65536  # bytes per read on subprocess pipes
+# Pipes are read as raw bytes; decode them the way text=True used to
+_ENCODING = locale.getpreferredencoding(False)
+# Console tools run without a conhost window on Windows
+_POPEN_FLAGS = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+if os.name == "nt":
+    _STARTUPINFO = subprocess.STARTUPINFO()
+    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+else:
+    _STARTUPINFO = None
+
+# The commands above only inspect the system, so successful output is reused
+# for CMD_TTL seconds: argv tuple -> (timestamp, output)
+CMD_TTL = 60
+_CMD_CACHE = {}
 # ------------------------------------------------
 
 
-def run_command(cmd, output_widget):
-    """Runs the command in a thread and streams output."""
+def _iter_text(pipe):
+    """Yield decoded text from a binary pipe; multi-byte chars and CRLF split across reads stay intact."""
+    dec = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(_ENCODING)(errors="replace"), translate=True)
+    while (chunk := pipe.read(READ_SIZE)):
+        yield dec.decode(chunk)
+    yield dec.decode(b"", final=True)
+
+
+def run_command(cmd, out_q, force=False):
+    """Runs the command in a thread and queues its output for the UI.
+
+    Output cached within CMD_TTL is replayed instead, unless force is set.
+    """
+    key = tuple(cmd)
+    if not force and (hit := _CMD_CACHE.get(key)) and time.time() - hit[0] < CMD_TTL:
+        out_q.put(hit[1])
+        out_q.put("\n[Exit code: 0] (cached)\n\n")
+        return
+
+    buf = io.StringIO()
     try:
         proc = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True
+            creationflags=_POPEN_FLAGS,
+            startupinfo=_STARTUPINFO,
+            bufsize=0
         )
-        for line in proc.stdout:
-            output_widget.configure(state="normal")
-            output_widget.insert(tk.END, line)
-            output_widget.see(tk.END)
-            output_widget.configure(state="disabled")
+        for text in _iter_text(proc.stdout):
+            buf.write(text)
+            out_q.put(text)
         proc.wait()
+        if proc.returncode == 0:
+            _CMD_CACHE[key] = (time.time(), buf.getvalue())
 
-        output_widget.configure(state="normal")
-        output_widget.insert(tk.END, f"\n[Exit code: {proc.returncode}]\n\n")
-        output_widget.configure(state="disabled")
+        out_q.put(f"\n[Exit code: {proc.returncode}]\n\n")
 
     except Exception as e:
-        output_widget.configure(state="normal")
-        output_widget.insert(tk.END, f"\n[ERROR] {e}\n")
-        output_widget.configure(state="disabled")
+        out_q.put(f"\n[ERROR] {e}\n")
 
 
 class CmdUI(tk.Tk):
@@ -53,25 +97,81 @@ class CmdUI(tk.Tk):
 
         ttk.Label(left, text="Select Command:").pack(anchor="w")
 
-        self.listbox = tk.Listbox(left, width=30, height=20)
+        # Listbox row i shows COMMANDS key self._keys[i]
+        self._keys = list(COMMANDS.keys())
+        # one Tcl list for all rows instead of an insert per name
+        self._cmd_var = tk.StringVar(value=tuple(self._keys))
+        self.listbox = tk.Listbox(left, listvariable=self._cmd_var, width=30, height=20)
         self.listbox.pack(pady=5)
 
-        for name in COMMANDS:
-            self.listbox.insert(tk.END, name)
-
         exec_btn = ttk.Button(left, text="Execute", command=self.execute_command)
         exec_btn.pack(pady=5)
 
         clear_btn = ttk.Button(left, text="Clear Output", command=self.clear_output)
         clear_btn.pack(pady=5)
 
+        # Skip the CMD_TTL output cache and always re-run the command
+        self.force_refresh = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left, text="Force refresh", variable=self.force_refresh).pack(anchor="w", pady=5)
+
+        # Oldest lines are dropped once the log grows past this many
+        ttk.Label(left, text="Cap log at N lines:").pack(anchor="w", pady=(5, 0))
+        self.max_lines = tk.IntVar(value=MAX_LINES)
+        ttk.Entry(left, textvariable=self.max_lines, width=8).pack(anchor="w")
+
         # Right panel (output)
         right = ttk.Frame(self)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         ttk.Label(right, text="Output:").pack(anchor="w")
-        self.output = scrolledtext.ScrolledText(right, wrap=tk.WORD, state="disabled")
-        self.output.pack(fill=tk.BOTH, expand=True)
+        # No wrapping and no undo stack: inserts don't re-flow or record history
+        body = ttk.Frame(right)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.output = tk.Text(body, wrap=tk.NONE, state="disabled", undo=False, maxundo=0)
+        yscroll = ttk.Scrollbar(body, orient="vertical", command=self.output.yview)
+        xscroll = ttk.Scrollbar(body, orient="horizontal", command=self.output.xview)
+        self.output.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        self.output.grid(row=0, column=0, sticky="nsew")
+        yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        body.rowconfigure(0, weight=1)
+        body.columnconfigure(0, weight=1)
+
+        # Worker threads only put text here; the Tk thread flushes it in batches
+        self.out_q = queue.SimpleQueue()
+        self.after(DRAIN_MS, self._drain)
+
+        # One worker pool per window; commands are submitted instead of spawning threads.
+        # Workers are joined at interpreter exit; each job reads a short inspection
+        # command to completion, so closing waits only for the commands in flight.
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="cmd")
+
+    def _drain(self):
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.out_q.get_nowait())
+            except queue.Empty:
+                break
+        if chunks:
+            # only follow new output if the user hasn't scrolled back
+            at_bottom = self.output.yview()[1] >= 0.999
+            self.output.configure(state="normal")
+            self.output.insert(tk.END, "".join(chunks))
+            self._trim()
+            if at_bottom:
+                self.output.see(tk.END)
+            self.output.configure(state="disabled")
+        self.after(DRAIN_MS, self._drain)
+
+    def _trim(self):
+        try:
+            cap = max(1, self.max_lines.get())
+        except tk.TclError:  # entry is empty or not a number
+            cap = MAX_LINES
+        lines = int(self.output.index("end-1c").split(".")[0])
+        if lines > cap:
+            self.output.delete("1.0", f"{lines - cap + 1}.0")
 
     def clear_output(self):
         self.output.configure(state="normal")
@@ -84,18 +184,12 @@ class CmdUI(tk.Tk):
             messagebox.showwarning("Select Something", "Please pick a command.")
             return
 
-        cmd_name = self.listbox.get(sel[0])
-        cmd = COMMANDS.get(cmd_name)
+        cmd_name = self._keys[sel[0]]
+        cmd = COMMANDS[cmd_name]
 
-        self.output.configure(state="normal")
-        self.output.insert(tk.END, f"\n=== Running: {cmd_name} ===\n")
-        self.output.configure(state="disabled")
+        self.out_q.put(f"\n=== Running: {cmd_name} ===\n")
 
-        threading.Thread(
-            target=run_command,
-            args=(cmd, self.output),
-            daemon=True
-        ).start()
+        self.pool.submit(run_command, cmd, self.out_q, self.force_refresh.get())
 
 
 if __name__ == "__main__":
@@ -8,15 +8,33 @@ Works on Windows/Linux/macOS (some parts Windows-specific like os.startfile).
 Edit COMMAND_WHITELIST to add/remove commands and tune behavior.
 """
 
+import codecs
+import concurrent.futures
+import functools
+import io
+import locale
 import os
+import queue
 import subprocess
 import shutil
-import threading
+import sys
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, ttk
+from tkinter import messagebox, ttk
+from types import MappingProxyType
 
 # ------------------ CONFIG ------------------
 DRY_RUN = False  # True = show what would run, don't actually execute
+DRAIN_MS = 50  # how often queued output is flushed into the log widget
+MAX_WORKERS = 8  # commands allowed to run at the same time
+MAX_LINES = 5000  # default cap on log lines; oldest lines are dropped first
+READ_SIZE = 65536  # bytes per read on subprocess pipes
+# Pipes are read as raw bytes; decode them the way text=True used to
+_ENCODING = locale.getpreferredencoding(False)
+
+@functools.lru_cache(maxsize=None)
+def _home_subdir(name):
+    """~/<name> for the current user, expanded once when the whitelist is built at import."""
+    return os.path.expanduser(f"~/{name}")
 
 # Map friendly command names to execution metadata.
 # Each value is a dict:
@@ -50,29 +68,75 @@ COMMAND_WHITELIST = {
     },
     "Open Downloads Folder": {
         "type": "opener",
-        "cmd": [os.path.expanduser("~/Downloads")],
+        "cmd": [_home_subdir("Downloads")],
         "requires_confirm": False
     }
 }
+# Read-only at runtime; argvs are stored as tuples
+for _meta in COMMAND_WHITELIST.values():
+    if isinstance(_meta["cmd"], list):  # "custom" entries may hold a function
+        _meta["cmd"] = tuple(_meta["cmd"])
+del _meta
+COMMAND_WHITELIST = MappingProxyType(COMMAND_WHITELIST)
 # --------------------------------------------
 
+# OS file association opener, resolved once at import
+if os.name == "nt":
+    _OPEN_FN = os.startfile
+else:
+    # macOS: open <path>, Linux: xdg-open <path>
+    _OPENER = "open" if sys.platform == "darwin" else "xdg-open"
+
+    def _OPEN_FN(path):
+        subprocess.Popen([_OPENER, path], close_fds=True)
+
+# PATH lookups are cached per executable name; cleared on Refresh / Clear Log
+@functools.lru_cache(maxsize=128)
+def _which(name):
+    return shutil.which(name)
+
 # Utility to resolve executable (prefer PATH binary when a simple name given)
 def resolve_cmd(meta):
     if meta["type"] == "exe":
         first = meta["cmd"][0]
         # if it's a single-name like "code", try shutil.which
         if os.path.sep not in first:
-            path = shutil.which(first)
+            path = _which(first)
             if path:
-                return [path] + meta["cmd"][1:]
+                return (path,) + meta["cmd"][1:]
             # else fall back to provided (maybe absolute)
         return meta["cmd"]
     return meta["cmd"]
 
-# Executor thread function: runs command and streams output to text widget
-def run_command(meta, output_widget):
+def _iter_text(pipe):
+    """Yield decoded text from a binary pipe; multi-byte chars and CRLF split across reads stay intact."""
+    dec = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(_ENCODING)(errors="replace"), translate=True)
+    while (chunk := pipe.read(READ_SIZE)):
+        yield dec.decode(chunk)
+    yield dec.decode(b"", final=True)
+
+class _Status:
+    """Queue entry that updates the status bar instead of the log."""
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+class _LazyFmt:
+    """Log entry whose argv join is deferred until _drain actually renders it."""
+    __slots__ = ("tmpl", "cmd")
+
+    def __init__(self, tmpl, cmd):
+        self.tmpl = tmpl
+        self.cmd = cmd
+
+    def __str__(self):
+        return self.tmpl.format(" ".join(self.cmd))
+
+# Executor thread function: runs command and queues output for the log widget
+def run_command(meta, out_q):
     if DRY_RUN:
-        output_widget_insert(output_widget, f"[DRY RUN] Would run: {meta['cmd']}\n")
+        out_q.put(f"[DRY RUN] Would run: {meta['cmd']}\n")
         return
 
     typ = meta["type"]
@@ -82,34 +146,29 @@ def run_command(meta, output_widget):
         if typ == "opener":
             # open folder or file using OS association
             target = cmd[0]
-            output_widget_insert(output_widget, f"Opening: {target}\n")
-            if os.name == "nt":
-                os.startfile(target)
-            else:
-                # macOS: open <path>, Linux: xdg-open <path>
-                opener = "open" if sys.platform == "darwin" else "xdg-open"
-                subprocess.Popen([opener, target], close_fds=True)
+            out_q.put(f"Opening: {target}\n")
+            _OPEN_FN(target)
+            return
+
+        if typ == "exe":
+            # GUI apps run until the user closes them; don't hold a pool worker on their pipe
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+            out_q.put(f"Launched: {cmd[0]} (pid {proc.pid})\n")
             return
 
         # For PowerShell / custom long commands, we capture output
-        output_widget_insert(output_widget, f"Executing: {' '.join(cmd)}\n\n")
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        out_q.put(_LazyFmt("Executing: {}\n\n", cmd))
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0)
 
-        # stream output line by line
-        for line in proc.stdout:
-            output_widget_insert(output_widget, line)
+        # stream output in large chunks rather than line by line
+        for text in _iter_text(proc.stdout):
+            out_q.put(text)
         proc.wait()
-        output_widget_insert(output_widget, f"\n[Process exited with code {proc.returncode}]\n\n")
+        out_q.put(f"\n[Process exited with code {proc.returncode}]\n\n")
     except FileNotFoundError:
-        output_widget_insert(output_widget, f"[ERROR] Executable not found: {cmd[0]}\n")
+        out_q.put(f"[ERROR] Executable not found: {cmd[0]}\n")
     except Exception as e:
-        output_widget_insert(output_widget, f"[ERROR] {e}\n")
-
-def output_widget_insert(widget, text):
-    widget.configure(state="normal")
-    widget.insert(tk.END, text)
-    widget.see(tk.END)
-    widget.configure(state="disabled")
+        out_q.put(f"[ERROR] {e}\n")
 
 # GUI wiring
 class JarvisRunner(tk.Tk):
@@ -123,12 +182,13 @@ class JarvisRunner(tk.Tk):
         left.pack(side=tk.LEFT, fill=tk.Y, padx=8, pady=8)
 
         ttk.Label(left, text="Predefined Commands").pack(anchor="nw")
-        self.cmd_list = tk.Listbox(left, width=30, height=20)
+        # Listbox row i shows COMMAND_WHITELIST key self._keys[i]
+        self._keys = list(COMMAND_WHITELIST.keys())
+        # one Tcl list for all rows instead of an insert per name
+        self._cmd_var = tk.StringVar(value=tuple(self._keys))
+        self.cmd_list = tk.Listbox(left, listvariable=self._cmd_var, width=30, height=20)
         self.cmd_list.pack(side=tk.TOP, fill=tk.Y, expand=False, padx=4, pady=4)
 
-        for name in COMMAND_WHITELIST.keys():
-            self.cmd_list.insert(tk.END, name)
-
         btn_frame = ttk.Frame(left)
         btn_frame.pack(fill=tk.X, pady=(6,0))
         exec_btn = ttk.Button(btn_frame, text="Execute", command=self.on_execute)
@@ -138,22 +198,89 @@ class JarvisRunner(tk.Tk):
         clear_btn = ttk.Button(btn_frame, text="Clear Log", command=self.clear_log)
         clear_btn.pack(side=tk.LEFT, padx=2)
 
+        # Oldest lines are dropped once the log grows past this many
+        ttk.Label(left, text="Cap log at N lines:").pack(anchor="w", pady=(6, 0))
+        self.max_lines = tk.IntVar(value=MAX_LINES)
+        ttk.Entry(left, textvariable=self.max_lines, width=8).pack(anchor="w")
+
         # Right pane: output log
         right = ttk.Frame(self)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=8, pady=8)
         ttk.Label(right, text="Output / Log").pack(anchor="nw")
-        self.output = scrolledtext.ScrolledText(right, state="disabled", wrap=tk.WORD)
-        self.output.pack(fill=tk.BOTH, expand=True)
+        # No wrapping and no undo stack: inserts don't re-flow or record history
+        body = ttk.Frame(right)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.output = tk.Text(body, wrap=tk.NONE, state="disabled", undo=False, maxundo=0)
+        yscroll = ttk.Scrollbar(body, orient="vertical", command=self.output.yview)
+        xscroll = ttk.Scrollbar(body, orient="horizontal", command=self.output.xview)
+        self.output.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        self.output.grid(row=0, column=0, sticky="nsew")
+        yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        body.rowconfigure(0, weight=1)
+        body.columnconfigure(0, weight=1)
 
         # Bottom: status
         self.status = ttk.Label(self, text="Ready", relief=tk.SUNKEN, anchor="w")
         self.status.pack(side=tk.BOTTOM, fill=tk.X)
 
+        # Worker threads only put text here; the Tk thread flushes it in batches
+        self.out_q = queue.SimpleQueue()
+        self.after(DRAIN_MS, self._drain)
+
+        # One worker pool per window; commands are submitted instead of spawning threads.
+        # Workers are joined at interpreter exit, so jobs must not outlive the command they run:
+        # "exe" launches are fire-and-forget and only piped commands are read on the worker.
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="jarvis")
+
+    def _drain(self):
+        chunks = []
+        status = None
+        while True:
+            try:
+                item = self.out_q.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Status):
+                status = item.text
+            else:
+                chunks.append(item)
+        if chunks:
+            # only follow new output if the user hasn't scrolled back
+            at_bottom = self.output.yview()[1] >= 0.999
+            self.output.configure(state="normal")
+            self.output.insert(tk.END, "".join(map(str, chunks)))
+            self._trim()
+            if at_bottom:
+                self.output.see(tk.END)
+            self.output.configure(state="disabled")
+        # applied after the insert, so "Finished" never shows ahead of the output
+        if status is not None:
+            self.status.config(text=status)
+        self.after(DRAIN_MS, self._drain)
+
+    def _trim(self):
+        try:
+            cap = max(1, self.max_lines.get())
+        except tk.TclError:  # entry is empty or not a number
+            cap = MAX_LINES
+        lines = int(self.output.index("end-1c").split(".")[0])
+        if lines > cap:
+            self.output.delete("1.0", f"{lines - cap + 1}.0")
+
     def refresh_list(self):
         # placeholder if you later want to dynamically refresh commands
+        _which.cache_clear()
         self.status.config(text="Command list refreshed")
 
     def clear_log(self):
+        _which.cache_clear()
+        # pending entries are dropped unrendered, so lazy ones are never formatted
+        while True:
+            try:
+                self.out_q.get_nowait()
+            except queue.Empty:
+                break
         self.output.configure(state="normal")
         self.output.delete(1.0, tk.END)
         self.output.configure(state="disabled")
@@ -164,11 +291,9 @@ class JarvisRunner(tk.Tk):
         if not sel:
             messagebox.showinfo("No selection", "Please pick a command from the list.")
             return
-        name = self.cmd_list.get(sel[0])
-        meta = COMMAND_WHITELIST.get(name)
-        if not meta:
-            messagebox.showerror("Not allowed", "Selected command is not whitelisted.")
-            return
+        # rows come straight from the whitelist, so every index maps to a known entry
+        name = self._keys[sel[0]]
+        meta = COMMAND_WHITELIST[name]
 
         # confirmation for dangerous commands
         if meta.get("requires_confirm"):
@@ -177,21 +302,20 @@ class JarvisRunner(tk.Tk):
                 self.status.config(text="Command cancelled")
                 return
 
-        # run in thread
+        # run on the worker pool
         self.status.config(text=f"Running: {name}")
-        t = threading.Thread(target=self._threaded_run, args=(meta, name), daemon=True)
-        t.start()
+        self.pool.submit(self._threaded_run, meta, name)
 
     def _threaded_run(self, meta, name):
         try:
             # attach a small heading
-            output_widget_insert(self.output, f"\n=== Running: {name} ===\n")
-            run_command(meta, self.output)
-            output_widget_insert(self.output, f"=== Finished: {name} ===\n")
-            self.status.config(text=f"Finished: {name}")
+            self.out_q.put(f"\n=== Running: {name} ===\n")
+            run_command(meta, self.out_q)
+            self.out_q.put(f"=== Finished: {name} ===\n")
+            self.out_q.put(_Status(f"Finished: {name}"))
         except Exception as e:
-            output_widget_insert(self.output, f"[ERROR-THREAD] {e}\n")
-            self.status.config(text=f"Error running: {name}")
+            self.out_q.put(f"[ERROR-THREAD] {e}\n")
+            self.out_q.put(_Status(f"Error running: {name}"))
 
 if __name__ == "__main__":
     app = JarvisRunner()
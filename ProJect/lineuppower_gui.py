@@ -1,16 +1,49 @@
+import atexit
+import base64
+import codecs
+import concurrent.futures
+import functools
+import io
+import locale
 import os
+import queue
 import shutil
 import subprocess
 import threading
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+import uuid
+from tkinter import ttk, messagebox
+from types import MappingProxyType
 
 # ---------------- CONFIG ----------------
 DRY_RUN = False
+DRAIN_MS = 50  # how often queued output is flushed into the log widget
+MAX_WORKERS = 8  # actions allowed to run at the same time
+MAX_LINES = 5000  # default cap on log lines; oldest lines are dropped first
+SCRIPT_TIMEOUT = 120  # seconds before a stuck script's PowerShell host is killed and restarted
+READ_SIZE = 65536  # bytes per read on subprocess pipes
+# Pipes are read as raw bytes; decode them the way text=True used to
+_ENCODING = locale.getpreferredencoding(False)
+# Console tools run without a conhost window on Windows
+_POPEN_FLAGS = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+if os.name == "nt":
+    _STARTUPINFO = subprocess.STARTUPINFO()
+    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+else:
+    _STARTUPINFO = None
 
 # Wi-Fi adapter name for PowerShell toggle
 WIFI_INTERFACE = "Wi-Fi"   # change if needed
 
+@functools.lru_cache(maxsize=None)
+def _home_subdir(name):
+    """~/<name> for the current user, expanded once when the whitelist is built at import."""
+    return os.path.expanduser(f"~/{name}")
+
+def _ps_quote(text):
+    """Quote text as a PowerShell single-quoted string literal."""
+    return "'" + text.replace("'", "''") + "'"
+
 # Each action is a PowerShell command
 ACTION_WHITELIST = {
     "open_vscode": {
@@ -22,7 +55,7 @@ ACTION_WHITELIST = {
     "open_downloads": {
         "label": "Open Downloads",
         "type": "ps",
-        "cmd": f"Start-Process '{os.path.expanduser('~/Downloads')}'",
+        "cmd": f"Start-Process {_ps_quote(_home_subdir('Downloads'))}",
         "dangerous": False,
     },
     "open_spotify": {
@@ -62,70 +95,194 @@ LINEUPS = {
     "Lineup 2 — Team B": ["open_notepad", "open_taskmgr", "wifi_off"],
 }
 
+# Both tables are read-only at runtime; lineups are stored as tuples
+ACTION_WHITELIST = MappingProxyType(ACTION_WHITELIST)
+LINEUPS = MappingProxyType({k: tuple(v) for k, v in LINEUPS.items()})
 # ----------------------------------------
 
-def append_log(widget, text):
-    widget.configure(state="normal")
-    widget.insert(tk.END, text)
-    widget.see(tk.END)
-    widget.configure(state="disabled")
+def _confirmed(meta):
+    if not meta["dangerous"]:
+        return True
+    return messagebox.askokcancel("Confirm", f"Run dangerous action: {meta['label']}?")
 
 
-def run_single_action(action_id, log_widget):
-    meta = ACTION_WHITELIST.get(action_id)
-    if not meta:
-        append_log(log_widget, f"[INVALID ACTION] {action_id}\n")
-        return
+def _new_decoder():
+    """Decoder for pipe output; multi-byte chars and CRLF split across reads stay intact."""
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(_ENCODING)(errors="replace"), translate=True)
 
-    label = meta["label"]
 
-    if meta["dangerous"]:
-        ok = messagebox.askokcancel("Confirm", f"Run dangerous action: {label}?")
-        if not ok:
-            append_log(log_widget, f"[CANCELLED] {label}\n")
-            return
+class PowerShellHost:
+    """
+    One long-lived powershell.exe that runs scripts fed over stdin, so actions
+    don't pay PowerShell's startup cost each time.
 
-    append_log(log_widget, f"\n[START] {label}\n")
+    Each script is sent base64-encoded (so console encodings can't mangle it)
+    and run with Invoke-Expression inside a try/finally that prints a sentinel
+    with its success flag; everything printed before the sentinel is that
+    script's output. Scripts run one at a time, and a script that hasn't
+    finished after SCRIPT_TIMEOUT seconds gets the host killed.
+    """
+    # -NonInteractive: a prompting cmdlet fails instead of reading the next script from stdin
+    ARGV = ("powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", "-")
 
-    if DRY_RUN:
-        append_log(log_widget, f"[DRY RUN] Would run: {meta['cmd']}\n")
-        append_log(log_widget, f"[END] {label}\n")
-        return
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proc = None
+        self._dec = None
+        self._pending = ""
 
-    # Build PowerShell command
-    ps_cmd = [
-        "powershell",
-        "-NoProfile",
-        "-ExecutionPolicy", "Bypass",
-        "-Command", meta["cmd"]
-    ]
+    def start(self):
+        with self._lock:
+            self._ensure_running()
 
-    try:
-        proc = subprocess.Popen(
-            ps_cmd,
+    def _ensure_running(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        self._proc = subprocess.Popen(
+            self.ARGV,
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True
+            creationflags=_POPEN_FLAGS,
+            startupinfo=_STARTUPINFO,
+            bufsize=0
+        )
+        self._dec = _new_decoder()
+        self._pending = ""
+
+    def run(self, script, on_text):
+        """
+        Run script in the host, passing its output to on_text as it arrives.
+        The script reports failures by setting $ok = $false (see _ps_step).
+        Returns 0 if nothing failed, 1 otherwise.
+        """
+        token = uuid.uuid4().hex
+        marker = f"<<<END::{token}::"
+        payload = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+        # The sentinel lives in the plain stdin line, outside the payload, so it is
+        # printed even if the payload fails to parse. It is assembled from two
+        # literals so an echoed input line can never contain the marker itself.
+        line = (
+            "$ok = $true; "
+            f"try {{ Invoke-Expression ([Text.Encoding]::Unicode.GetString([Convert]::FromBase64String('{payload}'))) }} "
+            "catch { $ok = $false; Write-Host $_ } "
+            f"finally {{ Write-Host ('<<<END::' + '{token}::' + $ok + '>>>') }}\n"
         )
 
-        for line in proc.stdout:
-            append_log(log_widget, line)
+        with self._lock:
+            self._ensure_running()
+            proc = self._proc
+            expired = threading.Event()
+
+            def expire():
+                expired.set()
+                proc.kill()  # unblocks _read_until with EOF
+
+            timer = threading.Timer(SCRIPT_TIMEOUT, expire)
+            timer.daemon = True
+            timer.start()
+            try:
+                proc.stdin.write(line.encode("ascii"))
+                return self._read_until(marker, on_text)
+            except (RuntimeError, OSError):
+                if expired.is_set():
+                    raise TimeoutError(f"script did not finish within {SCRIPT_TIMEOUT}s; PowerShell host killed") from None
+                raise
+            finally:
+                timer.cancel()
+
+    def _read_until(self, marker, on_text):
+        keep = len(marker) - 1  # a marker may straddle two reads
+        while True:
+            chunk = self._proc.stdout.read(READ_SIZE)
+            if not chunk:
+                tail = self._pending + self._dec.decode(b"", final=True)
+                if tail:
+                    on_text(tail)
+                self._proc = None
+                raise RuntimeError("PowerShell host exited unexpectedly")
+
+            buf = self._pending + self._dec.decode(chunk)
+            idx = buf.find(marker)
+            if idx < 0:
+                if buf[:-keep]:
+                    on_text(buf[:-keep])
+                self._pending = buf[-keep:]
+                continue
+            if buf[:idx]:
+                on_text(buf[:idx])
+            end = buf.find("\n", idx)
+            if end < 0:
+                # wait for the rest of the sentinel line
+                self._pending = buf[idx:]
+                continue
+            self._pending = buf[end + 1:]
+            return 0 if buf[idx + len(marker):end].startswith("True") else 1
+
+    def close(self):
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            return
+        proc.stdin.close()  # PowerShell exits at end of input
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+_ps_host = PowerShellHost()
 
-        proc.wait()
-        append_log(log_widget, f"[EXIT {proc.returncode}] {label}\n")
+
+def run_powershell(script, label, log_q):
+    try:
+        code = _ps_host.run(script, log_q.put)
+        log_q.put(f"[EXIT {code}] {label}\n")
 
     except Exception as e:
-        append_log(log_widget, f"[ERROR] {label}: {e}\n")
+        log_q.put(f"[ERROR] {label}: {e}\n")
+
+
+def _ps_step(cmd):
+    """Wrap one command so a failure clears $ok without stopping the steps after it."""
+    return f"try {{ {cmd}; if (-not $?) {{ $ok = $false }} }} catch {{ $ok = $false; Write-Host $_ }}"
 
 
-def run_lineup(name, log_widget):
-    append_log(log_widget, f"\n=== Running Lineup: {name} ===\n")
+def build_lineup_script(action_ids):
+    """Join actions into one PowerShell script, tagging each step with a [START] line."""
+    steps = []
+    for action_id in action_ids:
+        meta = ACTION_WHITELIST[action_id]
+        steps.append(f"Write-Host {_ps_quote('[START] ' + meta['label'])}")
+        steps.append(_ps_step(meta["cmd"]))
+    return "; ".join(steps)
+
+
+def run_lineup(name, log_q, pool):
+    """
+    Run a lineup as a single script on the shared PowerShell host.
+    Called on the Tk thread: dangerous actions are confirmed here, before the script is built.
+    """
+    log_q.put(f"\n=== Running Lineup: {name} ===\n")
+    approved = []
     for action in LINEUPS[name]:
-        threading.Thread(
-            target=run_single_action,
-            args=(action, log_widget),
-            daemon=True
-        ).start()
+        meta = ACTION_WHITELIST.get(action)
+        if not meta:
+            log_q.put(f"[INVALID ACTION] {action}\n")
+        elif not _confirmed(meta):
+            log_q.put(f"[CANCELLED] {meta['label']}\n")
+        else:
+            approved.append(action)
+
+    if not approved:
+        return
+
+    script = build_lineup_script(approved)
+    if DRY_RUN:
+        log_q.put(f"[DRY RUN] Would run: {script}\n")
+        log_q.put(f"[END] {name}\n")
+        return
+
+    pool.submit(run_powershell, script, name, log_q)
 
 
 # ---------------- GUI ----------------
@@ -140,21 +297,78 @@ class LineupGUI(tk.Tk):
 
         ttk.Label(left, text="Available Lineups").pack(anchor="w")
 
-        self.listbox = tk.Listbox(left, width=30, height=10)
+        # Listbox row i shows LINEUPS key self._keys[i]
+        self._keys = list(LINEUPS.keys())
+        # one Tcl list for all rows instead of an insert per name
+        self._lineup_var = tk.StringVar(value=tuple(self._keys))
+        self.listbox = tk.Listbox(left, listvariable=self._lineup_var, width=30, height=10)
         self.listbox.pack(pady=5)
 
-        for name in LINEUPS.keys():
-            self.listbox.insert(tk.END, name)
-
         ttk.Button(left, text="Run Lineup", command=self.execute).pack(pady=5)
         ttk.Button(left, text="Clear Log", command=self.clear_log).pack(pady=5)
 
+        # Oldest lines are dropped once the log grows past this many
+        ttk.Label(left, text="Cap log at N lines:").pack(anchor="w", pady=(5, 0))
+        self.max_lines = tk.IntVar(value=MAX_LINES)
+        ttk.Entry(left, textvariable=self.max_lines, width=8).pack(anchor="w")
+
         right = ttk.Frame(self)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         ttk.Label(right, text="Output Log").pack(anchor="w")
-        self.log = scrolledtext.ScrolledText(right, wrap=tk.WORD, state="disabled")
-        self.log.pack(fill=tk.BOTH, expand=True)
+        # No wrapping and no undo stack: inserts don't re-flow or record history
+        body = ttk.Frame(right)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.log = tk.Text(body, wrap=tk.NONE, state="disabled", undo=False, maxundo=0)
+        yscroll = ttk.Scrollbar(body, orient="vertical", command=self.log.yview)
+        xscroll = ttk.Scrollbar(body, orient="horizontal", command=self.log.xview)
+        self.log.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        self.log.grid(row=0, column=0, sticky="nsew")
+        yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        body.rowconfigure(0, weight=1)
+        body.columnconfigure(0, weight=1)
+
+        # Worker threads only put text here; the Tk thread flushes it in batches
+        self.log_q = queue.SimpleQueue()
+        self.after(DRAIN_MS, self._drain)
+
+        # One worker pool per window; lineups are submitted instead of spawning threads.
+        # Workers are joined at interpreter exit, and a lineup job holds its worker while it
+        # reads the host pipe under the host lock, so exit waits for submitted scripts
+        # (each bounded by SCRIPT_TIMEOUT).
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="lineup")
+
+        # Warm up the PowerShell host in the background; failures surface on first run
+        self.pool.submit(_ps_host.start)
+        atexit.register(_ps_host.close)
+
+    def _drain(self):
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.log_q.get_nowait())
+            except queue.Empty:
+                break
+        if chunks:
+            # only follow new output if the user hasn't scrolled back
+            at_bottom = self.log.yview()[1] >= 0.999
+            self.log.configure(state="normal")
+            self.log.insert(tk.END, "".join(chunks))
+            self._trim()
+            if at_bottom:
+                self.log.see(tk.END)
+            self.log.configure(state="disabled")
+        self.after(DRAIN_MS, self._drain)
+
+    def _trim(self):
+        try:
+            cap = max(1, self.max_lines.get())
+        except tk.TclError:  # entry is empty or not a number
+            cap = MAX_LINES
+        lines = int(self.log.index("end-1c").split(".")[0])
+        if lines > cap:
+            self.log.delete("1.0", f"{lines - cap + 1}.0")
 
     def execute(self):
         sel = self.listbox.curselection()
@@ -162,8 +376,8 @@ class LineupGUI(tk.Tk):
             messagebox.showinfo("No Selection", "Choose a lineup.")
             return
 
-        name = self.listbox.get(sel[0])
-        threading.Thread(target=run_lineup, args=(name, self.log), daemon=True).start()
+        name = self._keys[sel[0]]
+        run_lineup(name, self.log_q, self.pool)
 
     def clear_log(self):
         self.log.configure(state="normal")
@@ -5,24 +5,45 @@ Two macro "lineups" that run a set of predefined actions concurrently when click
 
 How it works:
 - Each action is whitelisted in ACTION_WHITELIST.
-- Clicking a lineup starts all its actions in separate threads/processes.
-- Wi-Fi toggles require confirmation and admin privileges on Windows.
+- Clicking a lineup starts all its actions as separate processes; one reader
+  thread (the Reactor) streams all of their output into the log.
+- Wi-Fi toggles require confirmation (one prompt per lineup) and admin privileges on Windows.
 - Edit paths / command mappings below to match your system.
 """
 
+import codecs
+import concurrent.futures
+import functools
+import io
+import locale
 import os
+import queue
+import selectors
 import shutil
 import subprocess
+import sys
 import threading
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, messagebox
+from types import MappingProxyType
 
 # ---------------- CONFIG ----------------
 DRY_RUN = False  # Set True to only simulate what would run
+DRAIN_MS = 50  # how often queued output is flushed into the log widget
+MAX_WORKERS = 8  # actions allowed to run at the same time
+MAX_LINES = 5000  # default cap on log lines; oldest lines are dropped first
+READ_SIZE = 65536  # bytes per read on subprocess pipes
+# Pipes are read as raw bytes; decode them the way text=True used to
+_ENCODING = locale.getpreferredencoding(False)
 
 # For Wi-Fi toggles on Windows: name of the network interface (commonly "Wi-Fi")
 WIFI_INTERFACE = "Wi-Fi"  # change if your adapter name differs (check `netsh interface show interface`)
 
+@functools.lru_cache(maxsize=None)
+def _home_subdir(name):
+    """~/<name> for the current user, expanded once when the whitelist is built at import."""
+    return os.path.expanduser(f"~/{name}")
+
 # Whitelisted actions: each key is an action id used by lineups
 # type: "exe" -> launch executable (list: executable + args)
 #       "opener" -> open folder/file via os.startfile (on Windows) or xdg-open/open
@@ -40,7 +61,7 @@ ACTION_WHITELIST = {
     "open_downloads": {
         "label": "Open Downloads folder",
         "type": "opener",
-        "cmd": [os.path.expanduser("~/Downloads")],
+        "cmd": [_home_subdir("Downloads")],
         "dangerous": False,
     },
     "open_spotify": {
@@ -83,105 +104,193 @@ LINEUPS = {
     "Lineup 1 — Dev Start": ["open_vscode", "open_downloads", "wifi_on", "open_spotify"],
     "Lineup 2 — Quick Tools": ["open_notepad", "open_taskmgr", "wifi_off"],
 }
+
+# Both tables are read-only at runtime; argvs and lineups are stored as tuples
+for _meta in ACTION_WHITELIST.values():
+    _meta["cmd"] = tuple(_meta["cmd"])
+del _meta
+ACTION_WHITELIST = MappingProxyType(ACTION_WHITELIST)
+LINEUPS = MappingProxyType({k: tuple(v) for k, v in LINEUPS.items()})
 # ----------------------------------------
 
 # ----------------- Helpers -----------------
+# OS file association opener, resolved once at import
+if os.name == "nt":
+    _OPEN_FN = os.startfile
+else:
+    # macOS: open <path>, Linux: xdg-open <path>
+    _OPENER = "open" if sys.platform == "darwin" else "xdg-open"
+
+    def _OPEN_FN(path):
+        subprocess.Popen([_OPENER, path], close_fds=True)
+
+# PATH / fallback lookups are cached per name; cleared from clear_log
+@functools.lru_cache(maxsize=128)
+def _which(name):
+    return shutil.which(name)
+
+_exists = functools.lru_cache(maxsize=128)(os.path.exists)
+
 def resolve_exec_cmd(meta):
     """
     For type 'exe' try shutil.which first, else use fallback or provided cmd.
-    Return a list suitable for subprocess or special handling for 'opener'.
+    Return an argv tuple suitable for subprocess or special handling for 'opener'.
     """
     if meta["type"] == "exe":
         base = meta["cmd"][0]
         # if base is a simple command name, try PATH lookup
         if os.path.sep not in base:
-            path = shutil.which(base)
+            path = _which(base)
             if path:
-                return [path] + meta["cmd"][1:]
+                return (path,) + meta["cmd"][1:]
         # fallback explicit path
         fallback = meta.get("fallback")
-        if fallback and os.path.exists(fallback):
-            return [fallback] + meta["cmd"][1:]
+        if fallback and _exists(fallback):
+            return (fallback,) + meta["cmd"][1:]
         # otherwise return original cmd (hoping it's runnable)
         return meta["cmd"]
     else:
         return meta["cmd"]
 
-def run_single_action(action_id, log_widget):
+class _LazyFmt:
+    """Log entry whose argv join is deferred until _drain actually renders it."""
+    __slots__ = ("tmpl", "cmd")
+
+    def __init__(self, tmpl, cmd):
+        self.tmpl = tmpl
+        self.cmd = cmd
+
+    def __str__(self):
+        return self.tmpl.format(" ".join(self.cmd))
+
+def _new_decoder():
+    """Per-pipe decoder; multi-byte chars and CRLF split across reads stay intact."""
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(_ENCODING)(errors="replace"), translate=True)
+
+class Reactor:
+    """
+    Single reader thread multiplexing the stdout pipes of running actions.
+    Windows can't select() on pipes, so there each pipe gets its own reader thread.
+    """
+    def __init__(self):
+        self._sel = selectors.DefaultSelector() if os.name != "nt" else None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._reaping = []  # (proc, on_exit) whose pipe has closed; reactor thread only
+
+    def register(self, proc, on_chunk, on_exit):
+        """
+        Stream proc.stdout to on_chunk(text); at EOF reap proc and call on_exit(returncode).
+        """
+        if self._sel is None:
+            threading.Thread(target=self._read_blocking, args=(proc, on_chunk, on_exit), daemon=True).start()
+            return
+        self._sel.register(proc.stdout, selectors.EVENT_READ, (proc, _new_decoder(), on_chunk, on_exit))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="lineup-reactor", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            for key, _ in self._sel.select(0.05):
+                proc, dec, on_chunk, on_exit = key.data
+                try:
+                    chunk = os.read(key.fd, READ_SIZE)
+                    if chunk:
+                        on_chunk(dec.decode(chunk))
+                        continue
+                    on_chunk(dec.decode(b"", final=True))
+                except Exception as e:
+                    on_chunk(f"[ERROR] reading output: {e}\n")
+                self._sel.unregister(key.fileobj)
+                key.fileobj.close()
+                self._reaping.append((proc, on_exit))
+            self._reap()
+
+    def _reap(self):
+        # A closed pipe doesn't mean the process is done (GUI apps detach stdout),
+        # so poll instead of blocking the reader on wait()
+        still_running = []
+        for proc, on_exit in self._reaping:
+            code = proc.poll()
+            if code is None:
+                still_running.append((proc, on_exit))
+            else:
+                on_exit(code)
+        self._reaping = still_running
+
+    @staticmethod
+    def _read_blocking(proc, on_chunk, on_exit):
+        dec = _new_decoder()
+        while (chunk := proc.stdout.read(READ_SIZE)):
+            on_chunk(dec.decode(chunk))
+        on_chunk(dec.decode(b"", final=True))
+        proc.stdout.close()
+        on_exit(proc.wait())
+
+_reactor = Reactor()
+
+def run_single_action(action_id, log_q):
     """
-    Validate and execute a single action by id, writing output to log_widget.
+    Validate and execute a single action by id, writing output to log_q.
+    Dangerous actions must already be confirmed (see LineupsApp.on_run_lineup).
     """
     meta = ACTION_WHITELIST.get(action_id)
     if not meta:
-        append_log(log_widget, f"[REJECTED] Unknown action id: {action_id}\n")
+        log_q.put(f"[REJECTED] Unknown action id: {action_id}\n")
         return
 
     label = meta.get("label", action_id)
-    if meta.get("dangerous", False):
-        # confirm before dangerous actions
-        confirmed = messagebox.askokcancel("Confirm action", f"Action '{label}' is marked dangerous. Proceed?")
-        if not confirmed:
-            append_log(log_widget, f"[CANCELLED] {label}\n")
-            return
-
-    append_log(log_widget, f"[START] {label}\n")
+    log_q.put(f"[START] {label}\n")
 
     if DRY_RUN:
-        append_log(log_widget, f"[DRY RUN] Would run: {meta}\n")
-        append_log(log_widget, f"[END] {label}\n\n")
+        log_q.put(f"[DRY RUN] Would run: {meta}\n")
+        log_q.put(f"[END] {label}\n\n")
         return
 
     try:
         if meta["type"] == "opener":
             target = meta["cmd"][0]
-            append_log(log_widget, f"Opening: {target}\n")
-            if os.name == "nt":
-                os.startfile(target)
-            else:
-                opener = "open" if os.uname().sysname == "Darwin" else "xdg-open"
-                subprocess.Popen([opener, target], close_fds=True)
-            append_log(log_widget, f"[OK] {label}\n\n")
+            log_q.put(f"Opening: {target}\n")
+            _OPEN_FN(target)
+            log_q.put(f"[OK] {label}\n\n")
             return
 
         cmd = resolve_exec_cmd(meta)
 
         # For simple GUI programs, Popen without waiting is fine (non-blocking)
         # For commands like netsh or taskmgr we also invoke Popen (they may spawn further processes).
-        append_log(log_widget, f"Running command: {' '.join(cmd)}\n")
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-
-        # stream output if any
-        if p.stdout:
-            for line in p.stdout:
-                append_log(log_widget, line)
-        p.wait()
-        append_log(log_widget, f"[EXIT {p.returncode}] {label}\n\n")
+        log_q.put(_LazyFmt("Running command: {}\n", cmd))
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0)
+
+        # the reactor streams any output and logs the exit code once the pipe closes
+        _reactor.register(p, log_q.put, lambda code: log_q.put(f"[EXIT {code}] {label}\n\n"))
     except FileNotFoundError:
-        append_log(log_widget, f"[ERROR] Executable not found for action {label}\n\n")
+        log_q.put(f"[ERROR] Executable not found for action {label}\n\n")
     except PermissionError:
-        append_log(log_widget, f"[ERROR] Permission denied executing {label}. Try running as admin.\n\n")
+        log_q.put(f"[ERROR] Permission denied executing {label}. Try running as admin.\n\n")
     except Exception as e:
-        append_log(log_widget, f"[ERROR] {label}: {e}\n\n")
+        log_q.put(f"[ERROR] {label}: {e}\n\n")
 
-def append_log(widget, text):
-    widget.configure(state="normal")
-    widget.insert(tk.END, text)
-    widget.see(tk.END)
-    widget.configure(state="disabled")
+def is_dangerous(action_id):
+    return ACTION_WHITELIST.get(action_id, {}).get("dangerous", False)
 
-def run_lineup(lineup_name, log_widget):
+def run_lineup(lineup_name, approved, log_q, pool):
     """
-    Run all actions in the lineup concurrently (each in its own thread).
+    Run all actions in the lineup concurrently (each as a job on the worker pool).
+    Dangerous actions only run if their id is in approved.
     """
     actions = LINEUPS.get(lineup_name, [])
-    append_log(log_widget, f"\n=== Starting lineup: {lineup_name} ===\n")
-    threads = []
+    log_q.put(f"\n=== Starting lineup: {lineup_name} ===\n")
+    futures = []
     for act in actions:
-        t = threading.Thread(target=run_single_action, args=(act, log_widget), daemon=True)
-        t.start()
-        threads.append(t)
-    # Optionally we can join if we want to wait; here we don't block UI.
-    append_log(log_widget, f"=== Dispatched {len(threads)} actions for {lineup_name} ===\n\n")
+        if is_dangerous(act) and act not in approved:
+            log_q.put(f"[CANCELLED] {ACTION_WHITELIST[act].get('label', act)}\n")
+            continue
+        futures.append(pool.submit(run_single_action, act, log_q))
+    # Optionally we can wait on the futures; here we don't block UI.
+    log_q.put(f"=== Dispatched {len(futures)} actions for {lineup_name} ===\n\n")
 
 # ----------------- GUI -----------------
 class LineupsApp(tk.Tk):
@@ -194,10 +303,12 @@ class LineupsApp(tk.Tk):
         left.pack(side=tk.LEFT, fill=tk.Y, padx=8, pady=8)
 
         ttk.Label(left, text="Lineups").pack(anchor="nw")
-        self.listbox = tk.Listbox(left, width=30, height=10)
+        # Listbox row i shows LINEUPS key self._keys[i]
+        self._keys = list(LINEUPS.keys())
+        # one Tcl list for all rows instead of an insert per name
+        self._lineup_var = tk.StringVar(value=tuple(self._keys))
+        self.listbox = tk.Listbox(left, listvariable=self._lineup_var, width=30, height=10)
         self.listbox.pack(pady=6)
-        for name in LINEUPS.keys():
-            self.listbox.insert(tk.END, name)
 
         execute_btn = ttk.Button(left, text="Run Lineup", command=self.on_run_lineup)
         execute_btn.pack(pady=4)
@@ -205,27 +316,95 @@ class LineupsApp(tk.Tk):
         clear_btn = ttk.Button(left, text="Clear Log", command=self.clear_log)
         clear_btn.pack(pady=4)
 
+        # Oldest lines are dropped once the log grows past this many
+        ttk.Label(left, text="Cap log at N lines:").pack(anchor="w", pady=(4, 0))
+        self.max_lines = tk.IntVar(value=MAX_LINES)
+        ttk.Entry(left, textvariable=self.max_lines, width=8).pack(anchor="w")
+
         right = ttk.Frame(self)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=8, pady=8)
 
         ttk.Label(right, text="Log / Output").pack(anchor="nw")
-        self.log = scrolledtext.ScrolledText(right, state="disabled", wrap=tk.WORD)
-        self.log.pack(fill=tk.BOTH, expand=True)
+        # No wrapping and no undo stack: inserts don't re-flow or record history
+        body = ttk.Frame(right)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.log = tk.Text(body, wrap=tk.NONE, state="disabled", undo=False, maxundo=0)
+        yscroll = ttk.Scrollbar(body, orient="vertical", command=self.log.yview)
+        xscroll = ttk.Scrollbar(body, orient="horizontal", command=self.log.xview)
+        self.log.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        self.log.grid(row=0, column=0, sticky="nsew")
+        yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        body.rowconfigure(0, weight=1)
+        body.columnconfigure(0, weight=1)
 
         # show action mapping button
         mapping_btn = ttk.Button(left, text="Show Actions", command=self.show_actions)
         mapping_btn.pack(pady=4)
 
+        # Worker threads only put text here; the Tk thread flushes it in batches
+        self.log_q = queue.SimpleQueue()
+        self.after(DRAIN_MS, self._drain)
+
+        # One worker pool per window; actions are submitted instead of spawning threads.
+        # Workers are joined at interpreter exit; a job only starts its process and hands
+        # the pipe to the (daemon) reactor thread, so it never holds a worker for long.
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="lineup")
+
+    def _drain(self):
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.log_q.get_nowait())
+            except queue.Empty:
+                break
+        if chunks:
+            # only follow new output if the user hasn't scrolled back
+            at_bottom = self.log.yview()[1] >= 0.999
+            self.log.configure(state="normal")
+            self.log.insert(tk.END, "".join(map(str, chunks)))
+            self._trim()
+            if at_bottom:
+                self.log.see(tk.END)
+            self.log.configure(state="disabled")
+        self.after(DRAIN_MS, self._drain)
+
+    def _trim(self):
+        try:
+            cap = max(1, self.max_lines.get())
+        except tk.TclError:  # entry is empty or not a number
+            cap = MAX_LINES
+        lines = int(self.log.index("end-1c").split(".")[0])
+        if lines > cap:
+            self.log.delete("1.0", f"{lines - cap + 1}.0")
+
     def on_run_lineup(self):
         sel = self.listbox.curselection()
         if not sel:
             messagebox.showinfo("Pick a lineup", "Please select a lineup to run.")
             return
-        name = self.listbox.get(sel[0])
-        # run in separate thread to keep UI responsive
-        threading.Thread(target=run_lineup, args=(name, self.log), daemon=True).start()
+        name = self._keys[sel[0]]
+
+        # one confirmation for all dangerous actions, asked here on the Tk thread
+        dangerous = [act for act in LINEUPS[name] if is_dangerous(act)]
+        approved = set()
+        if dangerous:
+            labels = "\n".join(f"- {ACTION_WHITELIST[act].get('label', act)}" for act in dangerous)
+            if messagebox.askokcancel("Confirm actions", f"These actions are marked dangerous:\n\n{labels}\n\nProceed?"):
+                approved = set(dangerous)
+
+        # dispatch only enqueues pool jobs, so the UI stays responsive
+        run_lineup(name, approved, self.log_q, self.pool)
 
     def clear_log(self):
+        _which.cache_clear()
+        _exists.cache_clear()
+        # pending entries are dropped unrendered, so lazy ones are never formatted
+        while True:
+            try:
+                self.log_q.get_nowait()
+            except queue.Empty:
+                break
         self.log.configure(state="normal")
         self.log.delete("1.0", tk.END)
         self.log.configure(state="disabled")